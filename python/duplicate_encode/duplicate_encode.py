@@ -1,14 +1,19 @@
+from collections import Counter
 def duplicate_encode_oneline_list(word):
-    """List comp version."""
-    return "".join(["(" if word.count(c) == 1 else ")" for c in word])  ##FIXME remove '[]' (and/or test)
+    """List comp version.
+
+    Counts once up front; calling word.count(c) for every c made this O(N^2).
+    """
+    counts = Counter(word)
+    return "".join(["(" if counts[c] == 1 else ")" for c in word])
 
 
 def duplicate_encode_oneline_gen(word):
-    """List comp version."""
-    return "".join("(" if word.count(c) == 1 else ")" for c in word)
+    """Generator version."""
+    counts = Counter(word)
+    return "".join("(" if counts[c] == 1 else ")" for c in word)
 
 
-from collections import Counter
 def duplicate_encode_oneline_vars(text):
     """Combined version."""
     counts = Counter(text)
@@ -22,11 +27,11 @@ def duplicate_encode_bash(word):
     for char in word:
         counter[char] = counter.get(char, 0) + 1
 
-    new_word = str()
-    for char in word:  #FIXME   str comp here
-        new_word += '(' if counter[char] == 1 else ')'
+    new_word = [None] * len(word)
+    for i, char in enumerate(word):
+        new_word[i] = '(' if counter[char] == 1 else ')'
 
-    return new_word
+    return "".join(new_word)
 
 
 def duplicate_encode_bash_single_update(word):
@@ -39,11 +44,11 @@ def duplicate_encode_bash_single_update(word):
         elif counter[char] == 1:
             counter[char] = 2
 
-    new_word = str()
-    for char in word:  #FIXME   str comp here
-        new_word += '(' if counter[char] == 1 else ')'
+    new_word = [None] * len(word)
+    for i, char in enumerate(word):
+        new_word[i] = '(' if counter[char] == 1 else ')'
 
-    return new_word
+    return "".join(new_word)
 
 def duplicate_encode_bash_single_update_str_join_instead_of_concat(word):
     """Bash's version - single update algorithm. using string.join instead of __radd__"""
@@ -58,20 +63,93 @@ def duplicate_encode_bash_single_update_str_join_instead_of_concat(word):
     return "".join(['(' if counter[char] == 1 else ')' for char in word])
 
 
+def duplicate_encode_bash_bytearray(word):
+    """Bash's version - single update algorithm, with a bytearray counter.
+
+    Indexing a bytearray by ord(char) is a plain C array load, no hashing.
+    Only covers ASCII, so anything else goes through the dict version.
+    """
+    if not word.isascii():
+        return duplicate_encode_bash_single_update_str_join_instead_of_concat(word)
+
+    counter = bytearray(128)
+    for char in word:
+        o = ord(char)
+        if counter[o] < 2:
+            counter[o] += 1
+
+    return "".join(['(' if counter[ord(char)] == 1 else ')' for char in word])
+
+
+def duplicate_encode_bash_bytearray_bytes(word):
+    """Bash's version - single update algorithm, bytearray counter over bytes.
+
+    Same as duplicate_encode_bash_bytearray, but iterates the latin1 bytes of
+    the input, which are already ints, so neither pass calls ord().
+    """
+    try:
+        buf = word.encode('latin1')
+    except UnicodeEncodeError:
+        return duplicate_encode_bash_single_update_str_join_instead_of_concat(word)
+
+    counter = bytearray(256)
+    for byte in buf:
+        if counter[byte] < 2:
+            counter[byte] += 1
+
+    return bytes([0x28 if counter[byte] == 1 else 0x29 for byte in buf]).decode('ascii')
+
+
+def duplicate_encode_bash_latin1_bytes(word):
+    """Bash's version, but working on the latin1 bytes of the input.
+
+    Iterating bytes gives ints directly, so there's no ord() and no unicode
+    in either pass, and the output is built as bytes (one byte per char)
+    rather than as a list of one-char strings. Anything that doesn't fit in
+    latin1 goes through the dict version.
+    """
+    try:
+        buf = word.encode('latin1')
+    except UnicodeEncodeError:
+        return duplicate_encode_bash_single_update_str_join_instead_of_concat(word)
+
+    counts = [0] * 256
+    for byte in buf:
+        counts[byte] += 1
+
+    return bytes([0x28 if counts[byte] == 1 else 0x29 for byte in buf]).decode('ascii')
+
+
 from collections import defaultdict
-def duplicate_encode_bash_improved(text):
+def duplicate_encode_bash_improved(text: str) -> str:
     """Bash's "improved" version.
 
     I tried using a dict comp here, but you can't reference yourself inside
     of a comprehension, nor assign to an expression so the `a,b=a[b]={},5`
     trick won't work. "Normal" dict it is...
+
+    The annotations only let mypyc (see the README) specialise the
+    defaultdict[str, int] operations; it compiles the other functions too.
     """
-    counter = defaultdict(int)
+    counter: defaultdict[str, int] = defaultdict(int)
     for char in text:
         counter[char] += 1
 
     return "".join([')' if counter[char]-1 else '(' for char in text])
 
+
+def duplicate_encode_bash_improved_plain_dict(text):
+    """Bash's "improved" version, with a plain dict instead of a defaultdict.
+
+    Lookups on a plain dict skip defaultdict's __missing__ machinery, so this
+    puts the counting on the same footing as the Counter based versions.
+    """
+    counter = {}
+    for char in text:
+        counter[char] = counter.get(char, 0) + 1
+
+    return "".join([')' if counter[char]-1 else '(' for char in text])
+
 from collections import defaultdict
 def duplicate_encode_bash_improved_single_update(text):
     """Bash's "improved" (again) version.
@@ -92,82 +170,292 @@ def duplicate_encode_bash_improved_single_update(text):
     return "".join([')' if counter[char] else '(' for char in text])
 
 
+def duplicate_encode_bash_improved_translate(text):
+    """Bash's "improved" version, but emitting with str.translate.
+
+    Counting is the same as duplicate_encode_bash_improved, but instead of
+    joining a comprehension we map each ordinal to ord('(') or ord(')') and
+    let translate walk the string in C.
+    """
+    counter = defaultdict(int)
+    for char in text:
+        counter[char] += 1
+
+    table = {ord(char): 40 if count == 1 else 41 for char, count in counter.items()}
+    return text.translate(table)
+
+
+def duplicate_encode_counter_translate(text):
+    """Counter + str.translate version.
+
+    Same as duplicate_encode_bash_improved_translate, but the counting loop
+    is done by Counter (in C) rather than by a Python for loop.
+    """
+    counts = Counter(text)
+    table = {ord(char): 40 if count == 1 else 41 for char, count in counts.items()}
+    return text.translate(table)
+
+
+def duplicate_encode_maketrans(text):
+    """Counter + str.maketrans version.
+
+    duplicate_encode_counter_translate spelled with the classic maketrans
+    idiom: one table mapping every char to '(' or ')', built from the counts.
+    """
+    table = str.maketrans({char: '(' if count == 1 else ')' for char, count in Counter(text).items()})
+    return text.translate(table)
+
+
+def duplicate_encode_bytes_translate(word):
+    """Counter + bytes.translate version.
+
+    bytes.translate with a 256-byte table is a straight array lookup per
+    byte, where str.translate with a dict has to hash every char. Counter
+    tallies the bytes (as ints) in C too. Only works for inputs that fit in
+    latin1, anything else goes through the str.translate version.
+    """
+    try:
+        buf = word.encode('latin1')
+    except UnicodeEncodeError:
+        return duplicate_encode_counter_translate(word)
+
+    counts = Counter(buf)
+    table = bytes([0x28 if counts[i] == 1 else 0x29 for i in range(256)])
+    return buf.translate(table).decode('ascii')
+
+
+def duplicate_encode_branchless(text):
+    """Branchless version.
+
+    ord('(') is 0x28 and ord(')') is 0x29, so the output byte is just
+    0x28 | (count != 1). Working that out once per distinct char leaves the
+    emit pass as a dict lookup per char, with no conditional expression.
+    """
+    codes = {char: 0x28 | (count != 1) for char, count in Counter(text).items()}
+    return bytes(map(codes.__getitem__, text)).decode('ascii')
+
+
+def duplicate_encode_track_seen(word):
+    """Track seen version, like duplicate_encode_track_seen on the Rust side.
+
+    Starts from all '(' and remembers where each char was first seen. When a
+    char turns up again, both that first position and the current one become
+    ')', so the output is only written for duplicates and there's no
+    separate counting pass.
+    """
+    out = bytearray(b'(' * len(word))
+    first = {}
+    for i, char in enumerate(word):
+        j = first.get(char)
+        if j is None:
+            first[char] = i
+        else:
+            out[j] = 0x29
+            out[i] = 0x29
+    return out.decode('ascii')
+
+
+def duplicate_encode_track_seen_single_update(text):
+    """Track seen version - single update algorithm.
+
+    The one-pass take on duplicate_encode_bash_improved_single_update: text
+    is only read once, instead of once to count and again to emit. Once a
+    char's first position has been flipped to ')' it's marked with -1, so it
+    never gets written again.
+    """
+    out = bytearray(b'(' * len(text))
+    first = {}
+    for i, char in enumerate(text):
+        j = first.get(char)
+        if j is None:
+            first[char] = i
+            continue
+        if j >= 0:
+            out[j] = 0x29
+            first[char] = -1
+        out[i] = 0x29
+    return out.decode('ascii')
+
+
+try:
+    import numpy as np
+    have_numpy = True
+except ImportError:
+    have_numpy = False
+
+try:
+    from numba import njit
+    have_numba = True
+except ImportError:
+    have_numba = False
+
+if have_numba:
+    try:
+        @njit(cache=True, boundscheck=False)
+        def _duplicate_encode_numba_kernel(buf):
+            counts = np.zeros(256, np.int32)
+            for i in range(buf.size):
+                counts[buf[i]] += 1
+
+            out = np.empty(buf.size, np.uint8)
+            for i in range(buf.size):
+                out[i] = 40 | (counts[buf[i]] > 1)
+            return out
+    except TypeError:
+        # built with mypyc: the kernel is already C, there's nothing to jit.
+        have_numba = False
+
+
+def duplicate_encode_numba(word):
+    """Numba version.
+
+    Views the (latin1) input as a uint8 array and runs the count and emit
+    loops in a jitted kernel, where LLVM is free to vectorize them. Anything
+    that doesn't fit in latin1 goes through the str.translate version.
+    Needs numba (and numpy).
+    """
+    try:
+        buf = np.frombuffer(word.encode('latin1'), np.uint8)
+    except UnicodeEncodeError:
+        return duplicate_encode_counter_translate(word)
+    return _duplicate_encode_numba_kernel(buf).tobytes().decode('ascii')
+
+
+def duplicate_encode_numpy(word):
+    """NumPy version.
+
+    Same idea as duplicate_encode_numba, but without the numba dependency:
+    bincount does the counting, and indexing a 256-byte lookup table with
+    the input does the emitting. No Python-level loop over the input.
+    Anything that doesn't fit in latin1 goes through the str.translate
+    version.
+    """
+    try:
+        buf = np.frombuffer(word.encode('latin1'), np.uint8)
+    except UnicodeEncodeError:
+        return duplicate_encode_counter_translate(word)
+    counts = np.bincount(buf, minlength=256)
+    lut = (0x28 | (counts != 1)).astype(np.uint8)
+    return lut[buf].tobytes().decode('ascii')
+
+
+def cached(function):
+    """Wrap function so repeated calls on the very same string object are free.
+
+    Only meant for the timing table, to show how much of a variant's time is
+    per-call overhead rather than actual work. Keyed on id(), with the input
+    kept alive alongside the result so the id can't be reused.
+    """
+    cache = {}
+    def wrapper(text):
+        hit = cache.get(id(text))
+        if hit is None:
+            hit = cache[id(text)] = (text, function(text))
+        return hit[1]
+    return wrapper
+
+
 
 number_of_test_runs=10
 input_word_size = 1_000_000
 # input_word_size = 1_000
 input_word_num = 10
+# each function is timed this many times over (number_of_test_runs calls
+# each), and the fastest is reported. the slower repeats are mostly noise
+# from whatever else the machine was doing.
+number_of_repeats = 3
+# time the functions concurrently in worker processes, one per CPU. quicker
+# for a smoke run, but the variants all compete for memory bandwidth and
+# cache, so the numbers are only comparable when timed serially.
+run_in_parallel = False
 
 chars_per_test = number_of_test_runs * input_word_size * input_word_num
-skip_slow_algos = chars_per_test > 1_000_000
-
-print(f"counting {chars_per_test:,} characters per test (over {number_of_test_runs} tests for 5 functions")
-
-
-import random
-from datetime import datetime
-# seed randomizer with static value. if we run this more than once, then the
-# input will change.
-random.seed(42)
-start = datetime.now()
-print("making a random number...")
-input_word_chunk = "".join([random.choice([chr(x) for x in range(ord("0"), ord("z"))]) for _ in range(input_word_size)])
-input_word = input_word_chunk * input_word_num
-print(f"done makinga random number (took {datetime.now() - start})")
-
-
-from timeit import timeit
-from functools import partial
-oneliner_list  = partial(duplicate_encode_oneline_list,  input_word)
-oneliner_gen   = partial(duplicate_encode_oneline_gen,   input_word)
-debasheses     = partial(duplicate_encode_bash,          input_word)
-debasheses_su_join = partial(duplicate_encode_bash_single_update_str_join_instead_of_concat,          input_word)
-debasheses_su  = partial(duplicate_encode_bash_single_update, input_word)
-debasheses_imp = partial(duplicate_encode_bash_improved, input_word)
-debasheses_imp_su = partial(duplicate_encode_bash_improved_single_update, input_word)
-oneliner_vars  = partial(duplicate_encode_oneline_vars,  input_word)
-
-oneline_list, oneline_gen = None, None
-if not skip_slow_algos:
-    oneline_list  = timeit(oneliner_list,  number=number_of_test_runs)
-    oneline_gen   = timeit(oneliner_gen,   number=number_of_test_runs)
-debashis      = timeit(debasheses,     number=number_of_test_runs)
-debashis_su_join = timeit(debasheses_su_join,     number=number_of_test_runs)
-debashis_su   = timeit(debasheses_su,  number=number_of_test_runs)
-debashis_imp  = timeit(debasheses_imp, number=number_of_test_runs)
-debashis_imp_su  = timeit(debasheses_imp_su, number=number_of_test_runs)
-oneline_vars  = timeit(oneliner_vars,  number=number_of_test_runs)
-
-print("output sorted by speed on tener's computer")
-if not skip_slow_algos:
-    print(f"One-liner list:    {oneline_list} seconds")
-    print(f"One-liner gen:     {oneline_gen} seconds")
-else:
-    factor = chars_per_test / 10_000
-    # print(f"One-liner list:    skipped.............estimate: {6*factor/3600} hours")  these estimates are for an old version on a specific computer.. not good.
-    # print(f"One-liner gen:     skipped.............estimate: {9*factor/3600} hours")
-    print(f"One-liner list:    skipped; test is too big")
-    print(f"One-liner gen:     skipped; test is too big")
-print(f"Debashis:                        {debashis} seconds")
-print(f"Debashis single update:          {debashis_su} seconds")
-print(f"Debashis single update join:     {debashis_su_join} seconds")
-print(f"Debashis improved:               {debashis_imp} seconds")
-print(f"Debashis improved single update: {debashis_imp_su} seconds")
-print(f"One-liner vars:                  {oneline_vars} seconds")
-
-# correctness
-control_output, generator_output = None, None
-if not skip_slow_algos:
-    control_output       = duplicate_encode_oneline_list(input_word)
-    generator_output     = duplicate_encode_oneline_gen(input_word)
-debashis_output      = duplicate_encode_bash(input_word)
-debashis_output_su_join = duplicate_encode_bash_single_update_str_join_instead_of_concat(input_word)
-debashis_su_output   = duplicate_encode_bash_single_update(input_word)
-debashis_imp_output  = duplicate_encode_bash_improved(input_word)
-debashis_imp_su_output  = duplicate_encode_bash_improved_single_update(input_word)
-vars_output          = duplicate_encode_oneline_vars(input_word)
-
-if skip_slow_algos:
-    assert debashis_output == debashis_imp_output == vars_output == debashis_su_output == debashis_imp_su_output == debashis_output_su_join
-else:
-    assert control_output == generator_output == debashis_output == debashis_imp_output == vars_output == debashis_su_output == debashis_imp_su_output == debashis_output_su_join
+
+# (name, function) pairs, timed and printed in this order. Variants that need
+# an optional dependency are None when it isn't usable, and get skipped.
+functions = [
+    ("One-liner list", duplicate_encode_oneline_list),
+    ("One-liner gen", duplicate_encode_oneline_gen),
+    ("Debashis", duplicate_encode_bash),
+    ("Debashis single update", duplicate_encode_bash_single_update),
+    ("Debashis single update join", duplicate_encode_bash_single_update_str_join_instead_of_concat),
+    ("Debashis improved", duplicate_encode_bash_improved),
+    ("Debashis improved plain dict", duplicate_encode_bash_improved_plain_dict),
+    ("Debashis improved single update", duplicate_encode_bash_improved_single_update),
+    ("Debashis improved translate", duplicate_encode_bash_improved_translate),
+    ("One-liner vars", duplicate_encode_oneline_vars),
+    ("Counter translate", duplicate_encode_counter_translate),
+    ("Counter maketrans", duplicate_encode_maketrans),
+    ("Counter bytes translate", duplicate_encode_bytes_translate),
+    ("Branchless", duplicate_encode_branchless),
+    ("Debashis bytearray", duplicate_encode_bash_bytearray),
+    ("Debashis bytearray bytes", duplicate_encode_bash_bytearray_bytes),
+    ("Debashis latin1 bytes", duplicate_encode_bash_latin1_bytes),
+    ("Track seen", duplicate_encode_track_seen),
+    ("Track seen single update", duplicate_encode_track_seen_single_update),
+    ("Numba", duplicate_encode_numba if have_numba else None),
+    ("NumPy", duplicate_encode_numpy if have_numpy else None),
+    # NOTE: cached! Only the very first timed call does any real work, so the
+    # best of the repeats is pure per-call overhead.
+    ("Counter translate (CACHED)", cached(duplicate_encode_counter_translate)),
+]
+
+from timeit import repeat
+def time_function(name, word, number):
+    """Warm up, then time, the function called name on word.
+
+    Returns the best of number_of_repeats timings of number calls.
+
+    Module level (and looked up by name) so it can be sent to a worker
+    process, which has to import this module to get at the functions.
+    """
+    function = dict(functions)[name]
+    function(word[:1000])  # warm up, e.g. so numba compiles its kernel
+    return min(repeat(lambda: function(word), number=number, repeat=number_of_repeats))
+
+
+def main():
+    names = [name for name, function in functions if function is not None]
+    print(f"counting {chars_per_test:,} characters per test (over {number_of_test_runs} tests, best of {number_of_repeats}, for {len(names)} functions")
+
+
+    import random
+    from datetime import datetime
+    # seed randomizer with static value. if we run this more than once, then the
+    # input will change.
+    random.seed(42)
+    start = datetime.now()
+    print("making a random number...")
+    alphabet = bytes(range(ord("0"), ord("z")))
+    input_word_chunk = bytes(random.choices(alphabet, k=input_word_size)).decode('ascii')
+    input_word = input_word_chunk * input_word_num
+    print(f"done makinga random number (took {datetime.now() - start})")
+
+
+    if run_in_parallel:
+        from concurrent.futures import ProcessPoolExecutor
+        print("WARNING: timing in parallel, the numbers below skew each other")
+        with ProcessPoolExecutor() as executor:
+            futures = {name: executor.submit(time_function, name, input_word, number_of_test_runs) for name in names}
+            timings = {name: future.result() for name, future in futures.items()}
+    else:
+        timings = {name: time_function(name, input_word, number_of_test_runs) for name in names}
+
+    print("output sorted by speed on tener's computer")
+    name_width = max(len(name) for name, _ in functions) + 1
+    for name, function in functions:
+        label = f"{name}:".ljust(name_width)
+        if function is None:
+            print(f"{label} skipped; optional dependency is not available")
+        else:
+            print(f"{label} {timings[name]} seconds")
+
+    # correctness
+    control_output = duplicate_encode_oneline_list(input_word)
+    for name, function in functions:
+        if function is not None:
+            assert function(input_word) == control_output, f"Wrong output for {name}"
+
+
+if __name__ == "__main__":
+    main()
@@ -211,6 +211,31 @@ fn duplicate_encode_parallel(text: &str) -> String {
     text
 }
 
+/// Similar to duplicate_encode_in_place, but counting into a fixed 256-entry
+/// array instead of a HashMap, then turning the counts into a 256-byte lookup
+/// table of '(' and ')'. The emit loop is then a plain table lookup per byte,
+/// with no hashing or branches. It is still scalar: there is no byte gather
+/// on baseline x86-64, so the compiler unrolls the loop but can't vectorize it.
+fn duplicate_encode_lut(text: &str) -> String {
+    let mut text = text.to_ascii_lowercase();
+    let mut counts = [0usize; 256];
+    for byte in text.as_bytes().iter() {
+        counts[*byte as usize] += 1;
+    }
+
+    // b'(' is 0x28 and b')' is 0x29, so setting the low bit for duplicates
+    // builds the table without branching on the count.
+    let mut lut = [0u8; 256];
+    for (entry, count) in lut.iter_mut().zip(counts.iter()) {
+        *entry = b'(' | (*count != 1) as u8;
+    }
+
+    for byte in unsafe { text.as_bytes_mut() } {
+        *byte = lut[*byte as usize];
+    }
+    text
+}
+
 /// A different approach to the algorithm that only loops through the input once
 /// and builds the output as it goes. By keeping a list of bytes that we have
 /// seen before, we can make a decision about which character to add to the
@@ -381,6 +406,11 @@ fn main() {
             body: duplicate_encode_parallel,
             enabled: true,
         },
+        NamedFunction {
+            name: "duplicate_encode_lut",
+            body: duplicate_encode_lut,
+            enabled: true,
+        },
         NamedFunction {
             name: "duplicate_encode_track_seen",
             body: duplicate_encode_track_seen,